@@ -0,0 +1,17 @@
+import importlib
+
+# Submodules are imported on first attribute access, so "import src.utils" stays cheap
+__all__ = ["cassette", "chat", "debug", "dedup", "evaluate", "json_stream", "llm", "retrieval", "search"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
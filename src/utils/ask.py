@@ -0,0 +1,76 @@
+"""Answer a single question from the command line with minimal startup cost.
+
+Example::
+
+    python -m src.utils.ask "Tell me about AWS Community Day New Zealand 2024"
+    python -m src.utils.ask --provider openai --model gpt-4o "..."
+
+Bedrock questions go straight through ``converse_stream`` with boto3 only;
+other providers import just their own LangChain integration via ``create_llm``.
+Nothing from CDK, langgraph or the agent stack is loaded.
+"""
+
+import argparse
+import os
+import sys
+
+DEFAULT_MODEL = "anthropic.claude-3-sonnet-20240229-v1:0"
+
+
+def _ask_bedrock(args) -> int:
+    from src.utils import chat as chat_util
+
+    stream = chat_util.chat(
+        args.question, model=args.model, region=args.region, max_tokens=args.max_tokens, temperature=args.temperature
+    )
+    for event in stream:
+        if isinstance(event, chat_util.TextDelta):
+            print(event.text, end="", flush=True)
+    print()
+
+    if args.stats:
+        stats = stream.stats
+        print(
+            f"ttft={stats.ttft or 0:.3f}s duration={stats.duration:.3f}s "
+            f"output_tokens={stats.output_tokens} tokens_per_sec={stats.tokens_per_sec or 0:.1f}",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def _ask_langchain(args) -> int:
+    from src.utils import llm as llm_util
+
+    llm = llm_util.create_llm(args.provider, args.model, temperature=args.temperature)
+    if llm is None:
+        print(f"Unsupported provider '{args.provider}'", file=sys.stderr)
+        return 2
+
+    for chunk in llm.stream(args.question):
+        print(chunk.content if isinstance(chunk.content, str) else "", end="", flush=True)
+    print()
+    return 0
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+
+    parser = argparse.ArgumentParser(description="Ask an LLM a one-shot question.")
+    parser.add_argument("question")
+    parser.add_argument("--provider", default="bedrock", help="bedrock, or any llm_type accepted by create_llm")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--region", default=os.environ.get("AWS_DEFAULT_REGION"))
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--temperature", type=float, default=0.1)
+    parser.add_argument("--stats", action="store_true", help="Print TTFT and throughput to stderr")
+    args = parser.parse_args(argv)
+
+    if args.provider == "bedrock":
+        return _ask_bedrock(args)
+    return _ask_langchain(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
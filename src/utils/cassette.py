@@ -0,0 +1,232 @@
+"""Record and replay Bedrock traffic and tool calls.
+
+Usage::
+
+    cassette = Cassette("agent.cassette.gz", mode="record")  # or mode="replay"
+    cassette.attach(bedrock_runtime_client)
+    cassette.attach(bedrock_agent_runtime_client)
+    tools = [cassette.wrap_tool(DuckDuckGoSearchRun()), query_aws]
+    ...
+    cassette.save()
+
+HTTP traffic is intercepted on botocore's ``before-send`` event, so retries and
+response parsing (including event streams) still run through botocore. In
+replay mode attached clients send unsigned requests, so no AWS credentials are
+needed offline; the clients still need a region. Requests are matched on operation name and request body;
+the URL is ignored because Bedrock agent session ids are part of the path.
+Identical requests are replayed in the order they were recorded.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+VERSION = 1
+MODES = ("record", "replay")
+
+
+class CassetteError(Exception):
+    pass
+
+
+def _canonical(body) -> str:
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return body or ""
+    return json.dumps(body, sort_keys=True, default=str)
+
+
+def _key(*parts) -> str:
+    return hashlib.sha1("\0".join(parts).encode()).hexdigest()
+
+
+class _BufferedRaw:
+    """``read(amt)`` on top of ``stream()``, returning ``b""`` once the body is exhausted."""
+
+    def __init__(self):
+        self._reader = None
+        self._buffer = b""
+
+    def read(self, amt=None, *args, **kwargs):
+        if self._reader is None:
+            self._reader = self.stream()
+
+        while amt is None or len(self._buffer) < amt:
+            data = next(self._reader, None)
+            if data is None:
+                break
+            self._buffer += data
+
+        if amt is None:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+
+class _RecordingRaw(_BufferedRaw):
+    def __init__(self, raw, start: float, on_done):
+        super().__init__()
+        self._raw = raw
+        self._last = start
+        self._chunks = []
+        self._on_done = on_done
+
+    def stream(self, *args, **kwargs):
+        try:
+            for data in self._raw.stream(*args, **kwargs):
+                now = time.perf_counter()
+                self._chunks.append((now - self._last, data))
+                self._last = now
+                yield data
+        finally:
+            self._finish()
+
+    def close(self):
+        self._raw.close()
+        self._finish()
+
+    def _finish(self):
+        if self._on_done is not None:
+            self._on_done(self._chunks)
+            self._on_done = None
+
+
+class _ReplayRaw(_BufferedRaw):
+    def __init__(self, chunks: list, realtime: bool):
+        super().__init__()
+        self._chunks = chunks
+        self._position = 0
+        self._realtime = realtime
+
+    def stream(self, *args, **kwargs):
+        while self._position < len(self._chunks):
+            delay, data = self._chunks[self._position]
+            self._position += 1
+            if self._realtime and delay > 0:
+                time.sleep(delay)
+            yield data
+
+    def close(self):
+        pass
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", realtime: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of {', '.join(MODES)}")
+
+        self.path = path
+        self.mode = mode
+        self.realtime = realtime
+        self._lock = threading.Lock()
+        self._recorded = []
+        self._queues = defaultdict(deque)
+
+        if mode == "replay":
+            self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.mode == "record":
+            self.save()
+
+    def attach(self, client):
+        service = client.meta.service_model.service_id.hyphenize()
+        if self.mode == "record":
+            handler = self._recording_handler(client)
+        else:
+            from botocore import UNSIGNED
+
+            handler = self._replay_handler
+            # Nothing reaches AWS on replay, skip signing so it works without credentials
+            client.meta.events.register(f"choose-signer.{service}", lambda **kwargs: UNSIGNED)
+        client.meta.events.register(f"before-send.{service}", handler)
+        return client
+
+    def wrap_tool(self, tool):
+        from langchain_core.tools import StructuredTool
+
+        def run(**kwargs):
+            key = _key("tool", tool.name, _canonical(kwargs))
+            if self.mode == "replay":
+                interaction = self._next(key, f"tool {tool.name}({kwargs})")
+                if self.realtime:
+                    time.sleep(interaction["delay"])
+                return interaction["output"]
+
+            start = time.perf_counter()
+            output = tool.invoke(kwargs)
+            self._record({"key": key, "delay": time.perf_counter() - start, "output": output})
+            return output
+
+        return StructuredTool.from_function(
+            func=run, name=tool.name, description=tool.description, args_schema=tool.args_schema
+        )
+
+    def save(self):
+        data = {"version": VERSION, "interactions": self._recorded}
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            raise CassetteError(f"Unsupported cassette version {data.get('version')} in {self.path}")
+
+        for interaction in data["interactions"]:
+            self._queues[interaction["key"]].append(interaction)
+
+    def _record(self, interaction: dict):
+        with self._lock:
+            self._recorded.append(interaction)
+
+    def _next(self, key: str, description: str) -> dict:
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise CassetteError(f"No recorded interaction left for {description} in {self.path}")
+            return queue.popleft()
+
+    def _recording_handler(self, client):
+        from botocore.awsrequest import AWSResponse
+
+        def handler(request, event_name, **kwargs):
+            key = _key(event_name, _canonical(request.body))
+            start = time.perf_counter()
+            # Send it ourselves so the response body can be teed into the cassette as it streams.
+            response = client._endpoint.http_session.send(request)
+            headers = dict(response.headers.items())
+
+            def on_done(chunks):
+                chunks = [[round(delay, 4), base64.b64encode(data).decode()] for delay, data in chunks]
+                self._record({"key": key, "status": response.status_code, "headers": headers, "chunks": chunks})
+
+            if not request.stream_output:
+                # botocore has already read non-streaming bodies inside send()
+                on_done([(time.perf_counter() - start, response.content)])
+                return response
+
+            raw = _RecordingRaw(response.raw, start, on_done)
+            return AWSResponse(response.url, response.status_code, response.headers, raw)
+
+        return handler
+
+    def _replay_handler(self, request, event_name, **kwargs):
+        from botocore.awsrequest import AWSResponse
+
+        interaction = self._next(_key(event_name, _canonical(request.body)), event_name)
+        chunks = [(delay, base64.b64decode(data)) for delay, data in interaction["chunks"]]
+        raw = _ReplayRaw(chunks, self.realtime)
+        return AWSResponse(request.url, interaction["status"], interaction["headers"], raw)
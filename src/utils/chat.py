@@ -0,0 +1,224 @@
+"""Streaming chat on top of the Bedrock ``converse_stream`` API.
+
+Usage::
+
+    stream = chat("Tell me about AWS Community Day New Zealand 2024", model=MODEL)
+    for event in stream:
+        if isinstance(event, TextDelta):
+            print(event.text, end="", flush=True)
+    print(stream.stats)
+
+    async for event in chat(question, model=MODEL):
+        ...
+
+Call ``stream.cancel()`` (from any thread) or stop iterating to close the
+connection, Bedrock stops generating once the stream is closed.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class TextDelta:
+    text: str
+    index: int = 0
+
+
+@dataclass
+class ToolUse:
+    tool_use_id: str
+    name: str
+    input: dict
+
+
+@dataclass
+class Usage:
+    input_tokens: int
+    output_tokens: int
+    stop_reason: str = None
+    latency_ms: int = None
+
+
+@dataclass
+class StreamStats:
+    ttft: float = None
+    duration: float = None
+    output_tokens: int = 0
+    tokens_per_sec: float = None
+    cancelled: bool = False
+
+
+def create_client(region: str = None):
+    import boto3
+
+    return boto3.client("bedrock-runtime", region_name=region or os.environ.get("AWS_DEFAULT_REGION"))
+
+
+class ChatStream:
+    def __init__(
+        self,
+        client,
+        model: str,
+        messages: list,
+        system: str = None,
+        max_tokens: int = 512,
+        temperature: float = 0.1,
+        tool_config: dict = None,
+    ):
+        self.client = client
+        self.model = model
+        self.messages = messages
+        self.system = system
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.tool_config = tool_config
+
+        self.stats = StreamStats()
+        self.stop_reason = None
+        self._chunks = []
+        self._stream = None
+        self._started = False
+        self._cancelled = threading.Event()
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def cancel(self):
+        self._cancelled.set()
+        self.stats.cancelled = True
+        if self._stream is not None:
+            self._stream.close()
+
+    def __iter__(self):
+        if self._started:
+            raise RuntimeError("ChatStream can only be iterated once")
+        self._started = True
+
+        kwargs = {
+            "modelId": self.model,
+            "messages": self.messages,
+            "inferenceConfig": {"maxTokens": self.max_tokens, "temperature": self.temperature},
+        }
+        if self.system:
+            kwargs["system"] = [{"text": self.system}]
+        if self.tool_config:
+            kwargs["toolConfig"] = self.tool_config
+
+        start = time.perf_counter()
+        first_token = None
+        deltas = 0
+        tools = {}
+
+        try:
+            if self._cancelled.is_set():
+                # Cancelled before the request went out, don't start a generation at all
+                return
+            self._stream = self.client.converse_stream(**kwargs)["stream"]
+            for event in self._stream:
+                if self._cancelled.is_set():
+                    break
+
+                if "contentBlockStart" in event:
+                    tool = event["contentBlockStart"]["start"].get("toolUse")
+                    if tool:
+                        index = event["contentBlockStart"]["contentBlockIndex"]
+                        tools[index] = {"id": tool["toolUseId"], "name": tool["name"], "input": ""}
+
+                elif "contentBlockDelta" in event:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    index = event["contentBlockDelta"]["contentBlockIndex"]
+                    delta = event["contentBlockDelta"]["delta"]
+                    deltas += 1
+                    if "text" in delta:
+                        self._chunks.append(delta["text"])
+                        yield TextDelta(delta["text"], index)
+                    elif "toolUse" in delta and index in tools:
+                        tools[index]["input"] += delta["toolUse"]["input"]
+
+                elif "contentBlockStop" in event:
+                    tool = tools.pop(event["contentBlockStop"]["contentBlockIndex"], None)
+                    if tool:
+                        yield ToolUse(tool["id"], tool["name"], json.loads(tool["input"] or "{}"))
+
+                elif "messageStop" in event:
+                    self.stop_reason = event["messageStop"]["stopReason"]
+
+                elif "metadata" in event:
+                    usage = event["metadata"].get("usage", {})
+                    self.stats.output_tokens = usage.get("outputTokens", 0)
+                    yield Usage(
+                        input_tokens=usage.get("inputTokens", 0),
+                        output_tokens=self.stats.output_tokens,
+                        stop_reason=self.stop_reason,
+                        latency_ms=event["metadata"].get("metrics", {}).get("latencyMs"),
+                    )
+        except Exception:
+            # Closing the stream from another thread surfaces as a read error
+            if not self._cancelled.is_set():
+                raise
+        finally:
+            if self._stream is not None:
+                self._stream.close()
+            self._finish(start, first_token, deltas)
+
+    async def __aiter__(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # The event loop is gone, nobody is listening any more
+                self.cancel()
+
+        def produce():
+            try:
+                for event in self:
+                    put(event)
+                    if self._cancelled.is_set():
+                        break
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if self.stats.duration is None:
+                self.cancel()
+
+    def _finish(self, start: float, first_token: float, deltas: int):
+        end = time.perf_counter()
+        self.stats.duration = end - start
+        if first_token is not None:
+            self.stats.ttft = first_token - start
+            tokens = self.stats.output_tokens or deltas
+            if end > first_token:
+                self.stats.tokens_per_sec = tokens / (end - first_token)
+
+
+def chat(question, model: str, client=None, region: str = None, **kwargs) -> ChatStream:
+    if isinstance(question, str):
+        messages = [{"role": "user", "content": [{"text": question}]}]
+    else:
+        messages = question
+
+    return ChatStream(client or create_client(region), model, messages, **kwargs)
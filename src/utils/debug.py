@@ -1,6 +1,3 @@
-from pyboxen import boxen
-
-
 class Colors:
     HEADER = "\033[95m"
     OKBLUE = "\033[94m"
@@ -24,6 +21,9 @@ COLOR_MAPPING = {
 
 def print_msg(msg: str, title: str = None, color: str = "blue", box=False):
     if box:
+        # pyboxen pulls in rich, only pay for it when a box is actually drawn
+        from pyboxen import boxen
+
         print(boxen(msg, title=title, color=color, fullwidth=True, style="horizontals"))
     else:
         if title:
@@ -0,0 +1,250 @@
+"""Drop near-duplicate chunks from the knowledge base corpus before it is indexed.
+
+Example::
+
+    python -m src.utils.dedup src/aws_community_day_demo/bedrock_agent/assets/knowledgebase_data_source/ec2.zip \\
+        --output ec2.dedup.zip --threshold 0.85 --report dedup_report.json
+
+Documents (or the page text of JSON documents) are split into sentence-aligned
+chunks of roughly the size the knowledge base uses. Chunks are compared with
+MinHash signatures over word shingles and bucketed with LSH. A chunk whose
+estimated Jaccard similarity to an earlier kept chunk reaches the threshold is
+dropped. The remaining chunks are written back to the same file names in the
+output archive.
+
+Kept documents are rewritten: whitespace inside each chunk is collapsed to
+single spaces and chunks are joined with blank lines, so the output is smaller
+than the input even when nothing is dropped. The report keeps the two apart:
+``bytes_in``/``bytes_out``/``bytes_saved`` compare the original and written
+files, ``duplicate_bytes`` counts only the text of dropped chunks.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import zipfile
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Bedrock knowledge bases default to ~300 token chunks
+DEFAULT_CHUNK_CHARS = 1200
+
+# The ec2.zip documents are JSON objects, the page text lives in one of these fields
+CONTENT_FIELDS = ("Content", "Concent")
+
+
+@dataclass
+class DedupReport:
+    documents: int = 0
+    documents_dropped: int = 0
+    chunks: int = 0
+    chunks_dropped: int = 0
+    exact_duplicates: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    duplicate_bytes: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - self.bytes_out
+
+    @property
+    def embedding_calls_saved(self) -> int:
+        # One embedding call per chunk at ingestion time
+        return self.chunks_dropped
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "bytes_saved": self.bytes_saved, "embedding_calls_saved": self.embedding_calls_saved}
+
+
+def split_chunks(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> list:
+    chunks, current = [], ""
+    for sentence in re.split(r"(?<=[.!?])\s+|\n\s*\n", text):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def shingles(text: str, size: int = 5) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def optimal_bands(threshold: float, num_perm: int) -> tuple:
+    """Pick the (bands, rows) split whose LSH S-curve crosses ``threshold``."""
+    best = None
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+
+    return best[1], best[2]
+
+
+class MinHashLSH:
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+        self._signatures = []
+
+    def signature(self, tokens: set) -> tuple:
+        hashes = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "little") for t in tokens]
+        return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in self._perms)
+
+    def query(self, signature: tuple) -> int:
+        """Return the id of a stored signature at or above the threshold, or -1."""
+        seen = set()
+        for band, buckets in enumerate(self._buckets):
+            key = signature[band * self.rows : (band + 1) * self.rows]
+            for candidate in buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                other = self._signatures[candidate]
+                similarity = sum(x == y for x, y in zip(signature, other)) / self.num_perm
+                if similarity >= self.threshold:
+                    return candidate
+
+        return -1
+
+    def insert(self, signature: tuple) -> int:
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for band, buckets in enumerate(self._buckets):
+            buckets[signature[band * self.rows : (band + 1) * self.rows]].append(index)
+        return index
+
+
+def dedup_documents(documents: dict, threshold: float = 0.85, num_perm: int = 64, chunk_chars=DEFAULT_CHUNK_CHARS):
+    """Deduplicate ``{name: text}`` in order, returning the kept text per document and a report."""
+    lsh = MinHashLSH(threshold=threshold, num_perm=num_perm)
+    exact = set()
+    report = DedupReport()
+    output = {}
+
+    for name, text in documents.items():
+        report.documents += 1
+        report.bytes_in += len(text.encode())
+
+        kept = []
+        for chunk in split_chunks(text, chunk_chars):
+            report.chunks += 1
+            digest = hashlib.sha1(" ".join(chunk.lower().split()).encode()).digest()
+            if digest in exact:
+                report.chunks_dropped += 1
+                report.exact_duplicates += 1
+                report.duplicate_bytes += len(chunk.encode())
+                continue
+
+            signature = lsh.signature(shingles(chunk))
+            if lsh.query(signature) >= 0:
+                report.chunks_dropped += 1
+                report.duplicate_bytes += len(chunk.encode())
+                continue
+
+            exact.add(digest)
+            lsh.insert(signature)
+            kept.append(chunk)
+
+        if not kept:
+            report.documents_dropped += 1
+            continue
+
+        output[name] = "\n\n".join(kept)
+        report.bytes_out += len(output[name].encode())
+
+    return output, report
+
+
+def _content_field(doc) -> str:
+    if isinstance(doc, dict):
+        for field in CONTENT_FIELDS:
+            if isinstance(doc.get(field), str):
+                return field
+    return None
+
+
+def dedup_zip(source: str, destination: str, **kwargs) -> DedupReport:
+    documents, wrappers = {}, {}
+    bytes_in = 0
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            data = archive.read(info)
+            bytes_in += len(data)
+            text = data.decode("utf-8", errors="replace")
+            try:
+                doc = json.loads(text)
+            except ValueError:
+                doc = None
+            field = _content_field(doc)
+            if field:
+                wrappers[info.filename] = (doc, field)
+                text = doc[field]
+            documents[info.filename] = text
+
+    output, report = dedup_documents(documents, **kwargs)
+
+    # Measure the archive contents, including the JSON wrappers, rather than the page text alone
+    report.bytes_in, report.bytes_out = bytes_in, 0
+    with zipfile.ZipFile(destination, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, text in output.items():
+            if name in wrappers:
+                doc, field = wrappers[name]
+                text = json.dumps({**doc, field: text})
+            data = text.encode()
+            report.bytes_out += len(data)
+            archive.writestr(name, data)
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Remove near-duplicate chunks from a corpus zip before indexing.")
+    parser.add_argument("source", help="Corpus zip, e.g. assets/knowledgebase_data_source/ec2.zip")
+    parser.add_argument("--output", required=True, help="Where to write the deduplicated zip")
+    parser.add_argument("--threshold", type=float, default=0.85, help="Jaccard similarity treated as duplicate")
+    parser.add_argument("--num-perm", type=int, default=64)
+    parser.add_argument("--chunk-chars", type=int, default=DEFAULT_CHUNK_CHARS)
+    parser.add_argument("--report", help="Write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = dedup_zip(
+        args.source, args.output, threshold=args.threshold, num_perm=args.num_perm, chunk_chars=args.chunk_chars
+    )
+    data = report.to_dict()
+    print(json.dumps(data, indent=2))
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(data, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
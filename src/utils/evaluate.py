@@ -0,0 +1,405 @@
+"""Run a question set against several LLM/agent configurations and compare them.
+
+Example::
+
+    python -m src.utils.evaluate --questions questions.json --configs configs.json \\
+        --workers 4 --output report.json --baseline baseline.json
+
+``configs.json`` is a list of objects matching :class:`EvalConfig`, e.g.
+``{"name": "sonnet-react", "kind": "react", "llm_type": "aws-redrock",
+"model": "anthropic.claude-3-sonnet-20240229-v1:0"}``. ``questions.json`` is a
+list of strings (or objects with a ``question`` key).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+
+from src.utils import llm as llm_util
+
+KINDS = ("converse", "agent-executor", "react", "bedrock-agent")
+ANSWER_INSTRUCTION = "\n\nPut your final answer inside <ANSWER></ANSWER> tags."
+
+# Allowed relative change in the "bad" direction before a metric counts as a regression.
+DEFAULT_THRESHOLDS = {
+    "latency_p50": 0.10,
+    "latency_p90": 0.15,
+    "ttft_p50": 0.15,
+    "output_tokens_mean": 0.20,
+    "tool_calls_mean": 0.25,
+    "answer_rate": 0.05,
+    "success_rate": 0.0,
+}
+HIGHER_IS_BETTER = {"answer_rate", "success_rate"}
+
+# Bedrock agent trace invocation types that are real tool calls, FINISH is the agent answering
+TOOL_INVOCATION_TYPES = {"ACTION_GROUP", "KNOWLEDGE_BASE"}
+
+
+@dataclass
+class EvalConfig:
+    name: str
+    kind: str
+    llm_type: str = "aws-redrock"
+    model: str = ""
+    region: str = None
+    temperature: float = 0
+    agent_id: str = None
+    agent_alias_id: str = "TSTALIASID"
+    max_tokens: int = 512
+
+
+@dataclass
+class EvalResult:
+    config: str
+    question: str
+    latency: float = 0.0
+    ttft: float = None
+    # None when the provider never reported usage, so missing counts don't look like zero
+    input_tokens: int = None
+    output_tokens: int = None
+    tool_calls: int = 0
+    answer: str = ""
+    answered: bool = False
+    error: str = None
+
+
+@dataclass
+class _Metrics:
+    start: float = field(default_factory=time.perf_counter)
+    first_token: float = None
+    input_tokens: int = None
+    output_tokens: int = None
+    tool_calls: int = 0
+
+    def token(self):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+
+    def usage(self, input_tokens, output_tokens):
+        # Each side is summed separately, one that is never reported stays None
+        if input_tokens is not None:
+            self.input_tokens = (self.input_tokens or 0) + input_tokens
+        if output_tokens is not None:
+            self.output_tokens = (self.output_tokens or 0) + output_tokens
+
+
+def _langchain_handler(metrics: _Metrics):
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class MetricsHandler(BaseCallbackHandler):
+        def on_llm_new_token(self, token, **kwargs):
+            if token:
+                metrics.token()
+
+        def on_llm_end(self, response, **kwargs):
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage:
+                        metrics.usage(usage.get("input_tokens"), usage.get("output_tokens"))
+
+        def on_tool_start(self, serialized, input_str, **kwargs):
+            metrics.tool_calls += 1
+
+    return MetricsHandler()
+
+
+def _create_streaming_llm(config: EvalConfig):
+    llm = llm_util.create_llm(config.llm_type, config.model, temperature=config.temperature)
+    # TTFT is only observable through on_llm_new_token, which needs streaming enabled
+    if hasattr(llm, "streaming"):
+        llm.streaming = True
+    # OpenAI models only report usage_metadata on a stream when asked to
+    if hasattr(llm, "stream_usage"):
+        llm.stream_usage = True
+    return llm
+
+
+def _build_converse(config: EvalConfig):
+    import boto3
+
+    client = boto3.client("bedrock-runtime", region_name=config.region or os.environ.get("AWS_DEFAULT_REGION"))
+
+    def run(question: str, metrics: _Metrics) -> str:
+        response = client.converse_stream(
+            modelId=config.model,
+            messages=[{"role": "user", "content": [{"text": question}]}],
+            inferenceConfig={"maxTokens": config.max_tokens, "temperature": config.temperature},
+        )
+        text = ""
+        for event in response["stream"]:
+            if "contentBlockDelta" in event:
+                metrics.token()
+                text += event["contentBlockDelta"]["delta"].get("text", "")
+            elif "metadata" in event:
+                usage = event["metadata"].get("usage", {})
+                metrics.usage(usage.get("inputTokens"), usage.get("outputTokens"))
+        return text
+
+    return run
+
+
+def _build_agent_executor(config: EvalConfig):
+    from langchain.agents import AgentExecutor, create_tool_calling_agent
+    from langchain_community.tools import DuckDuckGoSearchRun
+    from langchain_core.prompts import ChatPromptTemplate
+
+    llm = _create_streaming_llm(config)
+    tools = [DuckDuckGoSearchRun()]
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", "You are a helpful assistant"),
+            ("placeholder", "{chat_history}"),
+            ("human", "{input}"),
+            ("placeholder", "{agent_scratchpad}"),
+        ]
+    )
+    agent_executor = AgentExecutor(agent=create_tool_calling_agent(llm, tools, prompt), tools=tools)
+
+    def run(question: str, metrics: _Metrics) -> str:
+        response = agent_executor.invoke({"input": question}, config={"callbacks": [_langchain_handler(metrics)]})
+        return response["output"] if isinstance(response["output"], str) else str(response["output"])
+
+    return run
+
+
+def _build_react(config: EvalConfig):
+    from langchain_community.tools import DuckDuckGoSearchRun
+    from langchain_core.messages import HumanMessage
+    from langgraph.prebuilt import create_react_agent
+
+    react_agent = create_react_agent(_create_streaming_llm(config), [DuckDuckGoSearchRun()])
+
+    def run(question: str, metrics: _Metrics) -> str:
+        res = react_agent.invoke(
+            {"messages": [HumanMessage(content=question)]}, config={"callbacks": [_langchain_handler(metrics)]}
+        )
+        content = res["messages"][-1].content
+        return content if isinstance(content, str) else str(content)
+
+    return run
+
+
+def _build_bedrock_agent(config: EvalConfig):
+    import uuid
+
+    import boto3
+
+    client = boto3.client("bedrock-agent-runtime", region_name=config.region or os.environ.get("AWS_DEFAULT_REGION"))
+
+    def run(question: str, metrics: _Metrics) -> str:
+        response = client.invoke_agent(
+            agentId=config.agent_id,
+            agentAliasId=config.agent_alias_id,
+            sessionId=uuid.uuid4().hex,
+            inputText=question,
+            enableTrace=True,
+        )
+        result = ""
+        for event in response.get("completion"):
+            if "chunk" in event:
+                metrics.token()
+                result += event["chunk"]["bytes"].decode()
+            elif "trace" in event:
+                orchestration = event["trace"].get("trace", {}).get("orchestrationTrace", {})
+                usage = orchestration.get("modelInvocationOutput", {}).get("metadata", {}).get("usage")
+                if usage:
+                    metrics.usage(usage.get("inputTokens"), usage.get("outputTokens"))
+                invocation = orchestration.get("invocationInput", {}).get("invocationType")
+                if invocation in TOOL_INVOCATION_TYPES:
+                    metrics.tool_calls += 1
+        return result
+
+    return run
+
+
+BUILDERS = {
+    "converse": _build_converse,
+    "agent-executor": _build_agent_executor,
+    "react": _build_react,
+    "bedrock-agent": _build_bedrock_agent,
+}
+
+# Runners are built once per worker process, they hold clients and agent graphs that can't be pickled.
+_runners = {}
+
+
+def run_question(config: EvalConfig, question: str) -> EvalResult:
+    result = EvalResult(config=config.name, question=question)
+    try:
+        if config.name not in _runners:
+            _runners[config.name] = BUILDERS[config.kind](config)
+
+        metrics = _Metrics()
+        text = _runners[config.name](question + ANSWER_INSTRUCTION, metrics)
+        end = time.perf_counter()
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+
+    result.latency = end - metrics.start
+    result.ttft = metrics.first_token - metrics.start if metrics.first_token else None
+    result.input_tokens = metrics.input_tokens
+    result.output_tokens = metrics.output_tokens
+    result.tool_calls = metrics.tool_calls
+    result.answer = llm_util.get_tag_answer(text).strip()
+    result.answered = result.answer != "I don't know"
+    return result
+
+
+def run_evaluation(configs: list, questions: list, workers: int = 4, repeat: int = 1) -> list:
+    for config in configs:
+        if config.kind not in BUILDERS:
+            raise ValueError(f"Unknown config kind '{config.kind}', expected one of {', '.join(KINDS)}")
+
+    tasks = [(config, question) for _ in range(repeat) for config in configs for question in questions]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_question, *zip(*tasks)))
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+
+    k = (len(values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+
+def _mean(values: list) -> float:
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def summarize(results: list) -> dict:
+    summary = {}
+    for name in dict.fromkeys(r.config for r in results):
+        rows = [r for r in results if r.config == name]
+        ok = [r for r in rows if r.error is None]
+        n = len(ok) or 1
+        summary[name] = {
+            "runs": len(rows),
+            "errors": len(rows) - len(ok),
+            "success_rate": len(ok) / len(rows),
+            "answer_rate": sum(r.answered for r in ok) / n,
+            "latency_p50": percentile([r.latency for r in ok], 50),
+            "latency_p90": percentile([r.latency for r in ok], 90),
+            "latency_p99": percentile([r.latency for r in ok], 99),
+            "ttft_p50": percentile([r.ttft for r in ok], 50),
+            "ttft_p90": percentile([r.ttft for r in ok], 90),
+            "input_tokens_mean": _mean([r.input_tokens for r in ok]),
+            "output_tokens_mean": _mean([r.output_tokens for r in ok]),
+            "tool_calls_mean": sum(r.tool_calls for r in ok) / n,
+        }
+
+    return summary
+
+
+def check_regressions(summary: dict, baseline: dict, thresholds: dict = None) -> list:
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    regressions = []
+    # A config that disappeared (renamed, dropped, typo) must not pass the gate silently
+    for name in baseline:
+        if name not in summary:
+            regressions.append(f"{name}: in the baseline but was not run")
+
+    for name, metrics in summary.items():
+        for metric, allowed in thresholds.items():
+            current = metrics.get(metric)
+            previous = baseline.get(name, {}).get(metric)
+            if current is None or previous is None:
+                continue
+
+            if metric in HIGHER_IS_BETTER:
+                regressed = current < previous * (1 - allowed)
+            else:
+                regressed = previous > 0 and current > previous * (1 + allowed)
+
+            if regressed:
+                regressions.append(f"{name}: {metric} {previous:.3f} -> {current:.3f} (threshold {allowed:.0%})")
+
+    return regressions
+
+
+def format_report(summary: dict) -> str:
+    columns = ["runs", "errors", "answer_rate", "latency_p50", "latency_p90", "latency_p99", "ttft_p50"]
+    columns += ["input_tokens_mean", "output_tokens_mean", "tool_calls_mean"]
+    width = max([len(name) for name in summary] + [6])
+
+    lines = ["config".ljust(width) + "".join(c.rjust(20) for c in columns)]
+    for name, metrics in summary.items():
+        cells = []
+        for c in columns:
+            value = metrics[c]
+            if value is None:
+                value = "-"
+            elif isinstance(value, float):
+                value = f"{value:.3f}"
+            cells.append(str(value).rjust(20))
+        lines.append(name.ljust(width) + "".join(cells))
+
+    return "\n".join(lines)
+
+
+def _load_questions(path: str) -> list:
+    with open(path) as f:
+        data = json.load(f)
+    return [q["question"] if isinstance(q, dict) else q for q in data]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark LLM and agent configurations on a question set.")
+    parser.add_argument("--questions", required=True, help="JSON list of questions")
+    parser.add_argument("--configs", required=True, help="JSON list of EvalConfig objects")
+    parser.add_argument("--only", nargs="*", help="Only run the configs with these names")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="Write results and summary to this JSON file")
+    parser.add_argument("--baseline", help="Previous report to check for regressions")
+    parser.add_argument("--thresholds", help="JSON object overriding DEFAULT_THRESHOLDS")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+
+    with open(args.configs) as f:
+        configs = [EvalConfig(**c) for c in json.load(f)]
+    if args.only:
+        unknown = set(args.only) - {c.name for c in configs}
+        if unknown:
+            print(f"Unknown config names in --only: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 2
+        configs = [c for c in configs if c.name in args.only]
+
+    results = run_evaluation(configs, _load_questions(args.questions), workers=args.workers, repeat=args.repeat)
+    summary = summarize(results)
+    print(format_report(summary))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"summary": summary, "results": [asdict(r) for r in results]}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["summary"]
+        if args.only:
+            baseline = {name: metrics for name, metrics in baseline.items() if name in args.only}
+        thresholds = {**DEFAULT_THRESHOLDS, **json.loads(args.thresholds)} if args.thresholds else None
+        regressions = check_regressions(summary, baseline, thresholds)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Check that importing our modules stays within a time budget.
+
+Example::
+
+    python -m src.utils.importtime
+    python -m src.utils.importtime src.utils.ask --budget-ms 150
+
+Each module is imported in a fresh interpreter under ``python -X importtime``.
+The check fails if the cumulative import time exceeds the budget or if any
+forbidden heavy package (CDK, langchain, rich, ...) gets imported.
+"""
+
+import argparse
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = 150
+FORBIDDEN = ("aws_cdk", "langchain", "langchain_core", "langgraph", "pyboxen", "rich", "opensearchpy")
+
+# Modules that must start fast, their heavy dependencies are imported on use
+LIGHT_MODULES = (
+    "src.utils",
+    "src.utils.ask",
+    "src.utils.chat",
+    "src.utils.debug",
+    "src.utils.json_stream",
+    "src.utils.llm",
+    "src.utils.search",
+)
+
+
+def measure(module: str) -> tuple:
+    """Return (cumulative microseconds, imported top-level packages) for importing ``module``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+
+    total, packages = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        packages.add(name.strip().split(".")[0])
+        if name.strip() == module:
+            total = int(cumulative)
+
+    return total, packages
+
+
+def check(module: str, budget_ms: float = DEFAULT_BUDGET_MS, forbidden=FORBIDDEN) -> list:
+    total, packages = measure(module)
+    problems = []
+    if total / 1000 > budget_ms:
+        problems.append(f"{module}: import took {total / 1000:.1f}ms, budget is {budget_ms}ms")
+    for package in sorted(packages & set(forbidden)):
+        problems.append(f"{module}: imports '{package}' at load time")
+
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check import time of the utils modules.")
+    parser.add_argument("modules", nargs="*", default=LIGHT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    problems = []
+    for module in args.modules:
+        module_problems = check(module, args.budget_ms)
+        problems += module_problems
+        print(f"{'FAIL' if module_problems else 'ok':4} {module}")
+
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+THINKING_START = "<thinking>"
+THINKING_END = "</thinking>"
+FENCE = "```"
+FENCE_RE = re.compile(r"```[\w+-]*")
+LINE_START_RE = re.compile(r"(?:^|\n)[ \t]*[\[{]")
+
+
+class JsonStreamParser:
+    """Incrementally parse the JSON document in a streamed LLM response.
+
+    Text before the document (``<thinking>`` blocks, prose, the opening ```json
+    fence) is skipped. After a fence the document starts at the first bracket;
+    without one it must start at the beginning of a line, so brackets inside
+    prose are not mistaken for JSON. Each completed element of a top-level array
+    is returned as it closes; for a top-level object each completed field is
+    returned as a ``(key, value)`` tuple. Anything after the document is ignored.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._started = False
+        self._fenced = False
+        self._done = False
+        self._container = None
+        self._item = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def container(self) -> str:
+        """``"["`` or ``"{"`` once the top-level document has started, otherwise ``None``."""
+        return self._container
+
+    def feed(self, chunk: str) -> list:
+        if self._done or not chunk:
+            return []
+
+        if not self._started:
+            self._pending += chunk
+            chunk = self._skip_preamble()
+            if chunk is None:
+                return []
+
+        return self._consume(chunk)
+
+    def close(self) -> list:
+        if not self._started:
+            raise ValueError("No JSON document found in the response")
+        if not self._done:
+            raise ValueError("JSON document ended before its closing bracket")
+        return []
+
+    def _skip_preamble(self):
+        while True:
+            text = self._pending
+            candidates = [i for i in (text.find(THINKING_START), text.find(FENCE)) if i >= 0]
+            if self._fenced:
+                candidates += [i for i in (text.find("["), text.find("{")) if i >= 0]
+            else:
+                match = LINE_START_RE.search(text)
+                if match:
+                    candidates.append(match.end() - 1)
+            if not candidates:
+                return None
+
+            start = min(candidates)
+            if text.startswith(THINKING_START, start):
+                end = text.find(THINKING_END, start)
+                if end < 0:
+                    return None
+                self._pending = text[end + len(THINKING_END) :]
+            elif text.startswith(FENCE, start):
+                # Drop the fence together with its language tag, e.g. ```json
+                end = FENCE_RE.match(text, start).end()
+                if end == len(text):
+                    # The language tag may continue in the next chunk
+                    return None
+                self._pending = text[end:]
+                self._fenced = True
+            else:
+                self._started = True
+                self._container = text[start]
+                self._depth = 1
+                self._pending = ""
+                return text[start + 1 :]
+
+    def _consume(self, chunk: str) -> list:
+        items = []
+        for ch in chunk:
+            if self._in_string:
+                self._item.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._flush(items)
+                    self._done = True
+                    break
+            elif ch == "," and self._depth == 1:
+                self._flush(items)
+                continue
+
+            self._item.append(ch)
+
+        return items
+
+    def _flush(self, items: list):
+        text = "".join(self._item).strip()
+        self._item = []
+        if not text:
+            return
+
+        if self._container == "[":
+            items.append(json.loads(text))
+        else:
+            items.extend(json.loads("{" + text + "}").items())
+
+
+def iter_json_items(chunks: Iterable[str]) -> Iterator[Any]:
+    parser = JsonStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+
+    parser.close()
+
+
+def collect_json(chunks: Iterable[str]) -> Any:
+    items = []
+    parser = JsonStreamParser()
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+        if parser.done:
+            break
+
+    parser.close()
+    return dict(items) if parser.container == "{" else items
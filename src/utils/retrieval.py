@@ -0,0 +1,202 @@
+"""Hybrid BM25 + kNN retrieval against the knowledge base OpenSearch index.
+
+Usage::
+
+    client = create_opensearch_client(os.environ["COLLECTION_HOST"], "ap-southeast-2")
+    retriever = HybridRetriever(client, embed_fn=bedrock_embedder())
+    result = retriever.retrieve("How do I recover a snapshot?", token_budget=800)
+    print(result.tokens_saved, format_context(result.chunks))
+
+Both searches fetch ``candidates`` hits, which are fused with reciprocal rank
+fusion, reranked locally and trimmed to ``top_k`` chunks within the token
+budget. Savings are measured against passing the ``baseline_k`` best vector
+hits straight into the prompt. The default of 5 matches what the knowledge
+base returns to the agent today, since the stack keeps Bedrock's default
+number of results.
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+# Defaults match the names used by the stack and create-index-lambda
+VECTOR_INDEX_NAME = "bedrock-knowledgebase-index"
+VECTOR_FIELD_NAME = "bedrock-knowledgebase-default-vector"
+TEXT_FIELD_NAME = "AMAZON_BEDROCK_TEXT_CHUNK"
+METADATA_FIELD_NAME = "AMAZON_BEDROCK_METADATA"
+EMBEDDING_MODEL = "cohere.embed-english-v3"
+
+RRF_K = 60
+
+# Bedrock knowledge bases return 5 results unless numberOfResults is configured
+KB_DEFAULT_RESULTS = 5
+
+
+@dataclass
+class Chunk:
+    id: str
+    text: str
+    metadata: str = None
+    rrf_score: float = 0.0
+    score: float = 0.0
+    ranks: dict = field(default_factory=dict)
+
+
+@dataclass
+class RetrievalResult:
+    query: str
+    chunks: list
+    tokens_used: int
+    tokens_baseline: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.tokens_baseline - self.tokens_used, 0)
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly 4 characters per token for English text, good enough for budgeting
+    return math.ceil(len(text) / 4)
+
+
+def tokenize(text: str) -> list:
+    return re.findall(r"\w+", text.lower())
+
+
+def create_opensearch_client(host: str, region: str):
+    import boto3
+    from opensearchpy import AWSV4SignerAuth, OpenSearch, RequestsHttpConnection
+
+    auth = AWSV4SignerAuth(boto3.Session().get_credentials(), region, "aoss")
+    return OpenSearch(
+        hosts=[{"host": host.split("//")[-1], "port": 443}],
+        http_auth=auth,
+        use_ssl=True,
+        verify_certs=True,
+        connection_class=RequestsHttpConnection,
+        pool_maxsize=20,
+    )
+
+
+def bedrock_embedder(model: str = EMBEDDING_MODEL, region: str = None):
+    import boto3
+
+    client = boto3.client("bedrock-runtime", region_name=region)
+
+    def embed(text: str) -> list:
+        response = client.invoke_model(
+            modelId=model, body=json.dumps({"texts": [text], "input_type": "search_query"})
+        )
+        return json.loads(response["body"].read())["embeddings"][0]
+
+    return embed
+
+
+def reciprocal_rank_fusion(rankings: dict, k: int = RRF_K) -> list:
+    chunks, scores, ranks = {}, {}, {}
+    for name, ranking in rankings.items():
+        for rank, chunk in enumerate(ranking, start=1):
+            chunks.setdefault(chunk.id, chunk)
+            ranks.setdefault(chunk.id, {})[name] = rank
+            scores[chunk.id] = scores.get(chunk.id, 0.0) + 1 / (k + rank)
+
+    # Assigned once at the end, so fusing the same hits again doesn't accumulate
+    for chunk_id, chunk in chunks.items():
+        chunk.rrf_score = scores[chunk_id]
+        chunk.ranks = ranks[chunk_id]
+
+    return sorted(chunks.values(), key=lambda c: c.rrf_score, reverse=True)
+
+
+def lexical_rerank(query: str, chunks: list, k1: float = 1.2, b: float = 0.75, weight: float = 0.5) -> list:
+    """Blend BM25 over the candidate pool with the fused rank score."""
+    if not chunks:
+        return chunks
+
+    docs = [tokenize(c.text) for c in chunks]
+    avg_len = sum(len(d) for d in docs) / len(docs) or 1
+    df = Counter(term for d in docs for term in set(d))
+    terms = set(tokenize(query))
+
+    bm25 = []
+    for doc in docs:
+        tf = Counter(doc)
+        score = 0.0
+        for term in terms & tf.keys():
+            idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * len(doc) / avg_len))
+        bm25.append(score)
+
+    max_bm25 = max(bm25) or 1
+    max_rrf = max(c.rrf_score for c in chunks) or 1
+    for chunk, score in zip(chunks, bm25):
+        chunk.score = weight * score / max_bm25 + (1 - weight) * chunk.rrf_score / max_rrf
+
+    return sorted(chunks, key=lambda c: c.score, reverse=True)
+
+
+def format_context(chunks: list) -> str:
+    return "\n\n".join(f"<DATA>{c.text}</DATA>" for c in chunks)
+
+
+class HybridRetriever:
+    def __init__(
+        self,
+        client,
+        embed_fn,
+        index_name: str = VECTOR_INDEX_NAME,
+        vector_field: str = VECTOR_FIELD_NAME,
+        text_field: str = TEXT_FIELD_NAME,
+        candidates: int = 20,
+        reranker=lexical_rerank,
+    ):
+        self.client = client
+        self.embed_fn = embed_fn
+        self.index_name = index_name
+        self.vector_field = vector_field
+        self.text_field = text_field
+        self.candidates = candidates
+        self.reranker = reranker
+
+    def bm25_search(self, query: str, size: int) -> list:
+        body = {"size": size, "query": {"match": {self.text_field: query}}}
+        return self._search(body)
+
+    def knn_search(self, vector: list, size: int) -> list:
+        body = {"size": size, "query": {"knn": {self.vector_field: {"vector": vector, "k": size}}}}
+        return self._search(body)
+
+    def retrieve(self, query: str, top_k: int = 4, token_budget: int = 1000, baseline_k: int = KB_DEFAULT_RESULTS):
+        size = max(self.candidates, baseline_k)
+        knn = self.knn_search(self.embed_fn(query), size)
+        bm25 = self.bm25_search(query, size)
+
+        fused = reciprocal_rank_fusion({"knn": knn[: self.candidates], "bm25": bm25[: self.candidates]})
+        ranked = self.reranker(query, fused) if self.reranker else fused
+
+        chunks, used = [], 0
+        for chunk in ranked:
+            if len(chunks) >= top_k:
+                break
+            tokens = estimate_tokens(chunk.text)
+            if used + tokens > token_budget:
+                continue
+            chunks.append(chunk)
+            used += tokens
+
+        baseline = sum(estimate_tokens(c.text) for c in knn[:baseline_k])
+        return RetrievalResult(query=query, chunks=chunks, tokens_used=used, tokens_baseline=baseline)
+
+    def _search(self, body: dict) -> list:
+        body["_source"] = [self.text_field, METADATA_FIELD_NAME]
+        response = self.client.search(index=self.index_name, body=body)
+        return [
+            Chunk(
+                id=hit["_id"],
+                text=hit["_source"].get(self.text_field, ""),
+                metadata=hit["_source"].get(METADATA_FIELD_NAME),
+            )
+            for hit in response["hits"]["hits"]
+        ]
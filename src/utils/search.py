@@ -0,0 +1,187 @@
+"""Caching wrapper for web search tools such as ``DuckDuckGoSearchRun``.
+
+Usage::
+
+    search = CachedSearch(DuckDuckGoSearchRun(), cache_dir=".cache/search")
+    tools = [search.as_tool()]
+    ...
+    print(search.stats)
+
+Queries are normalized before lookup, so "AWS Community Day NZ?" and
+"aws  community day nz" share a cache entry. Only case, whitespace and trailing
+sentence punctuation are normalized; word order, symbols and search operators
+such as ``-windows`` or ``"spot fleet"`` are kept. Results are kept in memory
+(up to ``max_entries``) and, if ``cache_dir`` is set, on disk for ``ttl``
+seconds. Concurrent callers asking the same query wait for a single upstream
+search.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_TTL = 6 * 3600
+DEFAULT_MAX_CHARS = 2000
+DEFAULT_MAX_ENTRIES = 1024
+
+ELLIPSIS = " ..."
+
+# Leading characters can be search operators (-term, "phrase"), so only trailing sentence punctuation goes
+TRAILING_PUNCTUATION_RE = re.compile(r"[?!.,;:]+$")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    query = " ".join(query.lower().split())
+    return TRAILING_PUNCTUATION_RE.sub("", query).rstrip()
+
+
+def truncate(text: str, max_chars: int) -> str:
+    if not max_chars or len(text) <= max_chars:
+        return text
+
+    # Leave room for the ellipsis so the result never exceeds max_chars
+    limit = max_chars - len(ELLIPSIS)
+    if limit <= 0:
+        return text[:max_chars]
+
+    cut = text.rfind(" ", 0, limit)
+    return text[: cut if cut > 0 else limit] + ELLIPSIS
+
+
+class CachedSearch:
+    def __init__(
+        self,
+        search,
+        ttl: int = DEFAULT_TTL,
+        cache_dir: str = None,
+        max_chars: int = DEFAULT_MAX_CHARS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.search = search
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_chars = max_chars
+        self.max_entries = max_entries
+
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "memory_hits": 0, "disk_hits": 0, "coalesced": 0, "upstream_calls": 0}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+
+        hits = stats["memory_hits"] + stats["disk_hits"] + stats["coalesced"]
+        stats["hit_ratio"] = hits / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+    def run(self, query: str) -> str:
+        key = normalize_query(query) or query
+        now = time.time()
+        owner = False
+
+        with self._lock:
+            self._stats["requests"] += 1
+            entry = self._memory.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self._stats["memory_hits"] += 1
+                self._memory.move_to_end(key)
+                return truncate(entry[1], self.max_chars)
+            if entry:
+                del self._memory[key]
+
+            future = self._inflight.get(key)
+            if future:
+                self._stats["coalesced"] += 1
+            else:
+                future = self._inflight[key] = Future()
+                owner = True
+
+        if not owner:
+            return truncate(future.result(), self.max_chars)
+
+        try:
+            entry = self._read_disk(key, now)
+            if entry:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+            else:
+                with self._lock:
+                    self._stats["upstream_calls"] += 1
+                result = self.search.invoke(query) if hasattr(self.search, "invoke") else self.search(query)
+                entry = (time.time(), result)
+                self._write_disk(key, query, entry)
+
+            with self._lock:
+                self._memory[key] = entry
+                while len(self._memory) > self.max_entries:
+                    self._memory.popitem(last=False)
+            future.set_result(entry[1])
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+        return truncate(entry[1], self.max_chars)
+
+    def as_tool(self):
+        from langchain_core.tools import StructuredTool
+
+        def search(query: str) -> str:
+            return self.run(query)
+
+        return StructuredTool.from_function(
+            func=search,
+            name=getattr(self.search, "name", "search"),
+            description=getattr(self.search, "description", "Search the web for the given query."),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def _read_disk(self, key: str, now: float):
+        if not self.cache_dir:
+            return None
+
+        try:
+            with open(self._path(key)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if now - data["time"] >= self.ttl:
+            return None
+        return data["time"], data["result"]
+
+    def _write_disk(self, key: str, query: str, entry: tuple):
+        if not self.cache_dir:
+            return
+
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"time": entry[0], "query": query, "result": entry[1]}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            # The search itself succeeded, a broken disk cache only costs future hits
+            logger.warning("Failed to write search cache entry %s: %s", path, e)